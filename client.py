@@ -6,14 +6,26 @@ RESTful API for banks.
 Make sure the Flask app is running (e.g., `python app.py`) before using this.
 """
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:5000/api/banks"
 
+# One shared keep-alive session: TCP (and TLS, if enabled) connections are
+# reused across calls instead of paying a fresh handshake per request.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.headers.update(
+    {"Accept": "application/json", "Content-Type": "application/json"}
+)
+
 
 def list_banks():
     """Fetch and print all banks from the API."""
-    response = requests.get(BASE_URL)
+    response = _session.get(BASE_URL)
     response.raise_for_status()  # Raise an error if the response is not 2xx
 
     banks = response.json()
@@ -25,13 +37,26 @@ def list_banks():
 def create_bank(name, location):
     """Create a new bank via the API."""
     payload = {"name": name, "location": location}
-    response = requests.post(BASE_URL, json=payload)
+    response = _session.post(BASE_URL, data=orjson.dumps(payload))
     response.raise_for_status()
     bank = response.json()
     print("Created bank:", bank)
     return bank["id"]
 
 
+def create_banks(items):
+    """
+    Create many banks in a single API call.
+
+    `items` is a list of {"name": ..., "location": ...} dicts. This uses the
+    bulk endpoint, so N banks cost one HTTP request and one database commit
+    instead of N.
+    """
+    response = _session.post(f"{BASE_URL}/bulk", data=orjson.dumps(items))
+    response.raise_for_status()
+    print("Created banks:", response.json())
+
+
 def update_bank(bank_id, name=None, location=None):
     """
     Update an existing bank via the API.
@@ -44,14 +69,14 @@ def update_bank(bank_id, name=None, location=None):
     if location is not None:
         payload["location"] = location
 
-    response = requests.put(f"{BASE_URL}/{bank_id}", json=payload)
+    response = _session.put(f"{BASE_URL}/{bank_id}", data=orjson.dumps(payload))
     response.raise_for_status()
     print("Updated bank:", response.json())
 
 
 def delete_bank(bank_id):
     """Delete a bank via the API."""
-    response = requests.delete(f"{BASE_URL}/{bank_id}")
+    response = _session.delete(f"{BASE_URL}/{bank_id}")
     response.raise_for_status()
     print(f"Deleted bank with id {bank_id}")
 
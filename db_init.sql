@@ -5,6 +5,7 @@ GO
 CREATE TABLE Banks (
     id INT IDENTITY(1,1) PRIMARY KEY,
     name NVARCHAR(100) NOT NULL,
-    location NVARCHAR(100) NOT NULL
+    location NVARCHAR(100) NOT NULL,
+    row_version ROWVERSION NOT NULL
 );
 GO
@@ -4,20 +4,57 @@ PyTest test suite for the Flask CRUD application.
 
 We create an application with a separate (in-memory) SQLite database so that
 tests do not depend on a real SQL Server instance.
+
+The app fixture also applies raiseload("*") to every top-level ORM select,
+so if a future relationship (Branches, Accounts, ...) sneaks an unplanned
+lazy load into an endpoint, the test fails loudly instead of silently
+re-introducing N+1 queries.
 """
 
+import contextlib
 import json
+
 import pytest
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import raiseload
 
-from app import create_app, db, Bank
+from app import create_app, db, cache, Bank
 
 
-@pytest.fixture
+class _BoundSession(FlaskSession):
+    """
+    Session pinned to an explicit connection.
+
+    Flask-SQLAlchemy's Session resolves binds through the engine registry,
+    which would sidestep the per-test transaction owned by the db_session
+    fixture; this always returns the connection the session was created with.
+    """
+
+    def get_bind(self, *args, **kwargs):
+        return self.bind
+
+
+def _raise_on_unplanned_lazy_load(execute_state):
+    """Make any lazy relationship load raise instead of querying."""
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+    ):
+        execute_state.statement = execute_state.statement.options(
+            raiseload("*")
+        )
+
+
+@pytest.fixture(scope="session")
 def app():
     """
-    Test fixture that creates and configures a new app instance for each test.
+    Session-scoped app fixture: the app and schema are built exactly once.
 
-    We use SQLite in memory so tests are isolated and fast.
+    We use SQLite in memory so tests do not depend on a real SQL Server
+    instance. Per-test isolation comes from the db_session fixture below,
+    not from recreating tables.
     """
     test_config = {
         "TESTING": True,
@@ -26,23 +63,101 @@ def app():
     }
     app = create_app(test_config)
 
-    # Create all tables in the SQLite test database
     with app.app_context():
+        # pysqlite only emits BEGIN lazily, which would let handler commits
+        # bypass our outer transaction below. Take over transaction control
+        # explicitly, per the SQLAlchemy pysqlite docs.
+        @event.listens_for(db.engine, "connect")
+        def _disable_implicit_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, "begin")
+        def _explicit_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+        # Create all tables in the SQLite test database (once per session)
         db.create_all()
 
     yield app
 
-    # Teardown: drop all tables after tests finish
+    # Teardown: drop all tables after the whole session finishes
     with app.app_context():
         db.drop_all()
 
 
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """
+    Wrap each test in an outer transaction that is rolled back at the end.
+
+    The session joins the external transaction in create_savepoint mode
+    (SQLAlchemy's "joining a session into an external transaction" recipe),
+    so commits inside request handlers only release savepoints; rolling the
+    outer transaction back restores a clean database without re-running
+    CREATE TABLE for every test.
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+
+        original_session = db.session
+        db.session = db._make_scoped_session(
+            {
+                "bind": connection,
+                "join_transaction_mode": "create_savepoint",
+                "expire_on_commit": False,
+                "class_": _BoundSession,
+            }
+        )
+        event.listen(
+            db.session, "do_orm_execute", _raise_on_unplanned_lazy_load
+        )
+
+        yield db.session
+
+        event.remove(
+            db.session, "do_orm_execute", _raise_on_unplanned_lazy_load
+        )
+        db.session.remove()
+        db.session = original_session
+        transaction.rollback()
+        connection.close()
+
+        # The response cache outlives the rolled-back data; clear it so a
+        # test never sees another test's cached responses.
+        cache.clear()
+
+
 @pytest.fixture
 def client(app):
     """Flask test client fixture."""
     return app.test_client()
 
 
+@contextlib.contextmanager
+def count_queries(engine):
+    """
+    Count the SQL statements the engine executes inside the block.
+
+    Yields a one-element list so the running total is visible after the
+    block; used to pin a hard query budget on endpoints so an accidental
+    N+1 shows up as a test failure (per the SQLAlchemy FAQ recipe).
+    """
+    counter = [0]
+
+    def _count(conn, cursor, statement, *args, **kwargs):
+        # Ignore transaction control chatter (BEGIN/SAVEPOINT/...) from the
+        # per-test transaction wrapper; only real queries count.
+        if not statement.startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")):
+            counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
 def test_api_create_bank(client):
     """Test the API endpoint that creates a new bank."""
     payload = {"name": "Test Bank", "location": "Test City"}
@@ -57,7 +172,26 @@ def test_api_create_bank(client):
     assert "id" in data
 
 
-def test_api_get_banks(client):
+def test_api_bulk_create_banks(client):
+    """Test the bulk API endpoint that creates many banks at once."""
+    payload = [
+        {"name": "Bulk Bank A", "location": "City A"},
+        {"name": "Bulk Bank B", "location": "City B"},
+        {"name": "Bulk Bank C", "location": "City C"},
+    ]
+    response = client.post(
+        "/api/banks/bulk", data=json.dumps(payload), content_type="application/json"
+    )
+
+    assert response.status_code == 201
+    assert response.get_json() == {"created": 3}
+
+    # All three rows should now be visible through the list endpoint
+    banks = client.get("/api/banks").get_json()
+    assert len(banks) == 3
+
+
+def test_api_get_banks(app, client):
     """Test retrieving all banks via the API."""
     # First create a bank to ensure there is data
     client.post(
@@ -71,13 +205,46 @@ def test_api_get_banks(client):
         content_type="application/json",
     )
 
-    response = client.get("/api/banks")
+    with app.app_context():
+        engine = db.engine
+
+    # Listing all banks must stay a single SELECT, whatever the row count
+    with count_queries(engine) as queries:
+        response = client.get("/api/banks")
+    assert queries[0] <= 1
+
     assert response.status_code == 200
     data = response.get_json()
     assert isinstance(data, list)
     assert len(data) == 2
 
 
+def test_api_get_banks_etag_304(client):
+    """A repeated GET with the returned ETag should yield 304 Not Modified."""
+    client.post(
+        "/api/banks",
+        data=json.dumps({"name": "Bank A", "location": "City A"}),
+        content_type="application/json",
+    )
+
+    first = client.get("/api/banks")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get("/api/banks", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+
+    # A write invalidates the cached response, so the ETag stops matching
+    client.post(
+        "/api/banks",
+        data=json.dumps({"name": "Bank B", "location": "City B"}),
+        content_type="application/json",
+    )
+    third = client.get("/api/banks", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert len(third.get_json()) == 2
+
+
 def test_api_get_single_bank(client):
     """Test retrieving a single bank via the API."""
     # Create a bank first
@@ -96,6 +263,33 @@ def test_api_get_single_bank(client):
     assert data["name"] == "Single Bank"
 
 
+def test_api_get_single_bank_etag_304(client):
+    """A repeated single-bank GET with the returned ETag should yield 304."""
+    create_response = client.post(
+        "/api/banks",
+        data=json.dumps({"name": "Versioned Bank", "location": "Some City"}),
+        content_type="application/json",
+    )
+    bank_id = create_response.get_json()["id"]
+
+    first = client.get(f"/api/banks/{bank_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(f"/api/banks/{bank_id}", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+
+    # Updating the bank changes its validator, so the old ETag stops matching
+    client.put(
+        f"/api/banks/{bank_id}",
+        data=json.dumps({"location": "Other City"}),
+        content_type="application/json",
+    )
+    third = client.get(f"/api/banks/{bank_id}", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.get_json()["location"] == "Other City"
+
+
 def test_api_update_bank(client):
     """Test updating a bank via the API."""
     # Create a bank
@@ -120,6 +314,65 @@ def test_api_update_bank(client):
     assert data["name"] == "Old Name"  # Name should be unchanged
 
 
+def test_api_batch_update_banks(client):
+    """Test updating several banks in one PATCH request."""
+    client.post(
+        "/api/banks/bulk",
+        data=json.dumps(
+            [
+                {"name": "Bank A", "location": "City A"},
+                {"name": "Bank B", "location": "City B"},
+            ]
+        ),
+        content_type="application/json",
+    )
+    ids = [bank["id"] for bank in client.get("/api/banks").get_json()]
+
+    payload = [
+        {"id": ids[0], "location": "New City A"},
+        {"id": ids[1], "name": "Renamed Bank B"},
+    ]
+    response = client.patch(
+        "/api/banks", data=json.dumps(payload), content_type="application/json"
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {"updated": 2}
+
+    banks = {bank["id"]: bank for bank in client.get("/api/banks").get_json()}
+    assert banks[ids[0]]["location"] == "New City A"
+    assert banks[ids[0]]["name"] == "Bank A"
+    assert banks[ids[1]]["name"] == "Renamed Bank B"
+
+
+def test_api_batch_delete_banks(client):
+    """Test deleting several banks in one request."""
+    client.post(
+        "/api/banks/bulk",
+        data=json.dumps(
+            [
+                {"name": "Bank A", "location": "City A"},
+                {"name": "Bank B", "location": "City B"},
+                {"name": "Bank C", "location": "City C"},
+            ]
+        ),
+        content_type="application/json",
+    )
+    ids = [bank["id"] for bank in client.get("/api/banks").get_json()]
+
+    response = client.post(
+        "/api/banks/delete",
+        data=json.dumps(ids[:2]),
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert response.get_json() == {"deleted": 2}
+
+    remaining = client.get("/api/banks").get_json()
+    assert [bank["id"] for bank in remaining] == [ids[2]]
+
+
 def test_api_delete_bank(client):
     """Test deleting a bank via the API."""
     # Create a bank